@@ -0,0 +1 @@
+"""Keep the repository root importable so tests can load legacy_scopus."""
@@ -6,24 +6,55 @@ from __future__ import annotations
 import io
 import os
 import re
-from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any
 
+import numpy as np
 import pandas as pd
 import requests
 import streamlit as st
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
 API_URL = "https://api.elsevier.com/content/search/scopus"
 ABSTRACT_API_URL = "https://api.elsevier.com/content/abstract/eid/{eid}"
 DEFAULT_QUERY = 'TITLE-ABS-KEY ("inteligencia artificial" AND bibliotecas)'
 APP_VERSION = "2026-03-05-resumo-api-scopus"
-
-STOPWORDS = {
+MAX_PAGE_WORKERS = 8
+
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=MAX_PAGE_WORKERS,
+        pool_maxsize=2 * MAX_PAGE_WORKERS,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            raise_on_status=False,
+        ),
+    ),
+)
+
+STOPWORDS = frozenset({
     "a", "as", "o", "os", "de", "da", "das", "do", "dos", "e", "em", "no", "na", "nos", "nas",
     "um", "uma", "para", "por", "com", "the", "and", "for", "in", "on", "of", "to",
+})
+COLMAP = {
+    "eid": "eid",
+    "dc:title": "titulo",
+    "dc:creator": "autor",
+    "prism:coverDate": "data",
+    "prism:publicationName": "periodico",
+    "subtypeDescription": "tipo",
+    "citedby-count": "citacoes",
+    "prism:doi": "doi",
+    "prism:url": "url_scopus",
 }
+TOKEN_RE = re.compile(r"[A-Za-zÀ-ÖØ-öø-ÿ]{3,}", re.UNICODE)
 
 
 @dataclass
@@ -37,7 +68,7 @@ def api_headers(api_key: str) -> dict[str, str]:
 
 
 def get_page(api_key: str, query: str, count: int, start: int) -> dict[str, Any]:
-    response = requests.get(
+    response = SESSION.get(
         API_URL,
         headers=api_headers(api_key),
         params={"query": query, "count": count, "start": start},
@@ -55,73 +86,139 @@ def parse_total(payload: dict[str, Any]) -> int:
         return 0
 
 
-@st.cache_data(show_spinner=False)
-def search_scopus(api_key: str, query: str, count: int, max_results: int) -> SearchResult:
-    payload = get_page(api_key, query, count, 0)
-    total = parse_total(payload)
-    entries = payload.get("search-results", {}).get("entry", []) or []
+def dedupe_entries(entries: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    seen: set[str] = set()
+    unique: list[dict[str, Any]] = []
+    for entry in entries:
+        key = entry.get("eid") or entry.get("prism:doi")
+        if key:
+            if key in seen:
+                continue
+            seen.add(key)
+        unique.append(entry)
+    return unique
+
 
+@st.cache_data(show_spinner=False, ttl=24 * 3600, max_entries=64)
+def search_scopus(api_key: str, query: str, count: int, max_results: int) -> SearchResult:
+    total = parse_total(get_page(api_key, query, 1, 0))
     max_to_fetch = min(total, max_results)
-    for start in range(count, max_to_fetch, count):
-        page = get_page(api_key, query, count, start)
-        entries.extend(page.get("search-results", {}).get("entry", []) or [])
+    if max_to_fetch <= 0:
+        return SearchResult(total_results=total, entries=[])
+
+    starts = list(range(0, max_to_fetch, count))
+    entries: list[dict[str, Any]] = []
+    with ThreadPoolExecutor(max_workers=min(MAX_PAGE_WORKERS, len(starts))) as executor:
+        futures = {
+            start: executor.submit(get_page, api_key, query, count, start) for start in starts
+        }
+        for start in sorted(futures):
+            page = futures[start].result()
+            entries.extend(page.get("search-results", {}).get("entry", []) or [])
 
-    return SearchResult(total_results=total, entries=entries[:max_to_fetch])
+    return SearchResult(total_results=total, entries=dedupe_entries(entries)[:max_to_fetch])
 
 
+@st.cache_data(show_spinner=False, max_entries=16)
 def normalize_df(entries: list[dict[str, Any]]) -> pd.DataFrame:
     if not entries:
         return pd.DataFrame()
 
-    raw = pd.json_normalize(entries)
-    cols = [
-        "eid",
-        "dc:title",
-        "dc:creator",
-        "prism:coverDate",
-        "prism:publicationName",
-        "subtypeDescription",
-        "citedby-count",
-        "prism:doi",
-        "prism:url",
-    ]
-    df = raw[[c for c in cols if c in raw.columns]].copy()
-    df = df.rename(
-        columns={
-            "dc:title": "titulo",
-            "dc:creator": "autor",
-            "prism:coverDate": "data",
-            "prism:publicationName": "periodico",
-            "subtypeDescription": "tipo",
-            "citedby-count": "citacoes",
-            "prism:doi": "doi",
-            "prism:url": "url_scopus",
-        }
-    )
+    present = [src for src in COLMAP if any(src in entry for entry in entries)]
+    df = pd.DataFrame({COLMAP[src]: [entry.get(src, np.nan) for entry in entries] for src in present})
 
     if "data" in df.columns:
-        df["ano"] = pd.to_datetime(df["data"], errors="coerce").dt.year.astype("Int64")
+        df["ano"] = pd.to_numeric(df["data"].str.slice(0, 4), errors="coerce").astype("Int64")
     if "citacoes" in df.columns:
         df["citacoes"] = pd.to_numeric(df["citacoes"], errors="coerce").fillna(0).astype(int)
+    for col in ("autor", "periodico", "tipo"):
+        if col in df.columns:
+            df[col] = df[col].astype("category")
     return df
 
 
+@st.cache_data(show_spinner=False, max_entries=16)
 def top_terms(series: pd.Series, top_n: int = 20) -> pd.DataFrame:
-    counter: Counter[str] = Counter()
-    for text in series.dropna().astype(str):
-        for token in re.findall(r"[A-Za-zÀ-ÖØ-öø-ÿ]{3,}", text.lower()):
-            if token not in STOPWORDS:
-                counter[token] += 1
-    return pd.DataFrame(counter.most_common(top_n), columns=["termo", "frequencia"])
+    tokens = series.dropna().astype(str).str.lower().str.findall(TOKEN_RE).explode().dropna()
+    tokens = tokens[~tokens.isin(STOPWORDS)]
+    return tokens.value_counts().head(top_n).rename_axis("termo").reset_index(name="frequencia")
 
 
+@st.cache_data(show_spinner=False, max_entries=16)
+def to_csv_bytes(df: pd.DataFrame) -> bytes:
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False, encoding="utf-8")
+    return buffer.getvalue()
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
 def to_excel_bytes(df: pd.DataFrame) -> bytes:
     buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+    with pd.ExcelWriter(
+        buffer,
+        engine="xlsxwriter",
+        engine_kwargs={"options": {"strings_to_urls": False}},
+    ) as writer:
         df.to_excel(writer, index=False, sheet_name="bibliometria")
     return buffer.getvalue()
 
 
+@st.cache_data(show_spinner=False, max_entries=16)
+def compute_metrics(df: pd.DataFrame) -> tuple[int, float, int | str, int | str]:
+    total_cit, media_cit = 0, 0.0
+    if "citacoes" in df.columns:
+        cit = df["citacoes"]
+        total_cit = int(cit.sum())
+        media_cit = float(cit.mean())
+
+    ano_ini: int | str = "-"
+    ano_fim: int | str = "-"
+    if "ano" in df.columns:
+        ano = df["ano"].dropna()
+        if len(ano):
+            ano_ini, ano_fim = int(ano.min()), int(ano.max())
+    return total_cit, media_cit, ano_ini, ano_fim
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def publications_per_year(df: pd.DataFrame) -> pd.DataFrame:
+    if "ano" not in df.columns:
+        return pd.DataFrame()
+    return (
+        df["ano"]
+        .dropna()
+        .value_counts(sort=False)
+        .rename_axis("ano")
+        .reset_index(name="publicacoes")
+        .sort_values("ano", ignore_index=True)
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def citation_distribution(df: pd.DataFrame) -> pd.DataFrame:
+    if "citacoes" not in df.columns or df["citacoes"].empty:
+        return pd.DataFrame()
+    bins = [0, 1, 5, 10, 25, 50, 100, float("inf")]
+    labels = ["0", "1-4", "5-9", "10-24", "25-49", "50-99", "100+"]
+    citacoes = df["citacoes"].clip(lower=0)
+    faixas = pd.cut(citacoes, bins=bins, labels=labels, right=False, include_lowest=True)
+    dist_citacoes = faixas.value_counts(sort=False).reset_index()
+    dist_citacoes.columns = ["faixa_citacoes", "documentos"]
+    return dist_citacoes
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def top_by_column(df: pd.DataFrame, col: str, top_n: int) -> pd.DataFrame:
+    if col not in df.columns:
+        return pd.DataFrame()
+    top = df[col].value_counts().head(top_n)
+    if top.empty:
+        return pd.DataFrame()
+    top_df = top.rename_axis(col).reset_index(name="publicacoes")
+    top_df[col] = top_df[col].astype(str)
+    return top_df
+
+
 def show_rank_chart(
     title: str,
     data: pd.DataFrame,
@@ -195,7 +292,7 @@ def parse_scopus_abstract(payload: dict[str, Any]) -> str:
 def fetch_article_abstract(api_key: str, eid: str) -> tuple[str, int]:
     if not eid:
         return "", 0
-    response = requests.get(
+    response = SESSION.get(
         ABSTRACT_API_URL.format(eid=eid),
         headers=api_headers(api_key),
         params={"view": "FULL"},
@@ -459,10 +556,7 @@ def main() -> None:
         st.caption(f"Resumos de artigos consultados: {consultados}. Resumos obtidos: {obtidos}.")
 
     docs = len(df)
-    total_cit = int(df["citacoes"].sum()) if "citacoes" in df.columns else 0
-    media_cit = float(df["citacoes"].mean()) if "citacoes" in df.columns else 0.0
-    ano_ini = int(df["ano"].min()) if "ano" in df.columns and df["ano"].notna().any() else "-"
-    ano_fim = int(df["ano"].max()) if "ano" in df.columns and df["ano"].notna().any() else "-"
+    total_cit, media_cit, ano_ini, ano_fim = compute_metrics(df)
 
     resumo_df = pd.DataFrame(
         [
@@ -474,38 +568,11 @@ def main() -> None:
         ]
     )
 
-    por_ano = pd.DataFrame()
-    if "ano" in df.columns:
-        por_ano = df.dropna(subset=["ano"]).groupby("ano").size().reset_index(name="publicacoes")
-        if not por_ano.empty:
-            por_ano = por_ano.sort_values("ano")
-
-    dist_citacoes = pd.DataFrame()
-    if "citacoes" in df.columns and not df["citacoes"].empty:
-        bins = [0, 1, 5, 10, 25, 50, 100, float("inf")]
-        labels = ["0", "1-4", "5-9", "10-24", "25-49", "50-99", "100+"]
-        citacoes = df["citacoes"].clip(lower=0)
-        faixas = pd.cut(citacoes, bins=bins, labels=labels, right=False, include_lowest=True)
-        dist_citacoes = faixas.value_counts(sort=False).reset_index()
-        dist_citacoes.columns = ["faixa_citacoes", "documentos"]
-
-    autores_df = pd.DataFrame()
-    if "autor" in df.columns:
-        top_autores = df["autor"].dropna().astype(str).value_counts().head(15)
-        if not top_autores.empty:
-            autores_df = top_autores.rename_axis("autor").reset_index(name="publicacoes")
-
-    periodicos_df = pd.DataFrame()
-    if "periodico" in df.columns:
-        top_periodicos = df["periodico"].dropna().astype(str).value_counts().head(15)
-        if not top_periodicos.empty:
-            periodicos_df = top_periodicos.rename_axis("periodico").reset_index(name="publicacoes")
-
-    tipos_df = pd.DataFrame()
-    if "tipo" in df.columns:
-        top_tipos = df["tipo"].dropna().astype(str).value_counts().head(10)
-        if not top_tipos.empty:
-            tipos_df = top_tipos.rename_axis("tipo").reset_index(name="publicacoes")
+    por_ano = publications_per_year(df)
+    dist_citacoes = citation_distribution(df)
+    autores_df = top_by_column(df, "autor", 15)
+    periodicos_df = top_by_column(df, "periodico", 15)
+    tipos_df = top_by_column(df, "tipo", 10)
 
     termos_df = pd.DataFrame()
     if "titulo" in df.columns:
@@ -573,7 +640,7 @@ def main() -> None:
 
     st.download_button(
         "Baixar CSV",
-        data=df_display.to_csv(index=False).encode("utf-8"),
+        data=to_csv_bytes(df_display),
         file_name="bibliometria_scopus.csv",
         mime="text/csv",
         use_container_width=True,
@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import argparse
+from functools import lru_cache
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -12,6 +13,35 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+MAP_MAX_CONCURRENCY = 8
+
+MAP_PROMPT = ChatPromptTemplate.from_template(
+    "Você é um assistente especialista em sumarização.\n"
+    "Resuma o trecho abaixo em até 5 bullets curtos, mantendo fatos principais.\n\n"
+    "Trecho:\n{context}"
+)
+REDUCE_PROMPT = ChatPromptTemplate.from_template(
+    "Você recebeu resumos parciais de um documento longo.\n"
+    "Gere um resumo final em português com:\n"
+    "1) visão geral (2-3 frases)\n"
+    "2) principais pontos em bullets\n"
+    "3) próximos passos sugeridos (opcional)\n\n"
+    "Resumos parciais:\n{summaries}"
+)
+
+
+@lru_cache(maxsize=4)
+def _get_llm(model_name: str) -> ChatOpenAI:
+    return ChatOpenAI(model=model_name, temperature=0)
+
+
+@lru_cache(maxsize=4)
+def _get_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+    )
+
 
 def summarize_text(
     text: str,
@@ -23,34 +53,18 @@ def summarize_text(
     if not text.strip():
         raise ValueError("Input text is empty.")
 
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-    )
-    docs = splitter.create_documents([text])
+    chunks = _get_splitter(chunk_size, chunk_overlap).split_text(text)
 
-    llm = ChatOpenAI(model=model_name, temperature=0)
+    llm = _get_llm(model_name)
     parser = StrOutputParser()
 
-    map_prompt = ChatPromptTemplate.from_template(
-        "Você é um assistente especialista em sumarização.\n"
-        "Resuma o trecho abaixo em até 5 bullets curtos, mantendo fatos principais.\n\n"
-        "Trecho:\n{context}"
-    )
-    map_chain = map_prompt | llm | parser
-    partial_summaries = [
-        map_chain.invoke({"context": doc.page_content}) for doc in docs
-    ]
-
-    reduce_prompt = ChatPromptTemplate.from_template(
-        "Você recebeu resumos parciais de um documento longo.\n"
-        "Gere um resumo final em português com:\n"
-        "1) visão geral (2-3 frases)\n"
-        "2) principais pontos em bullets\n"
-        "3) próximos passos sugeridos (opcional)\n\n"
-        "Resumos parciais:\n{summaries}"
+    map_chain = MAP_PROMPT | llm | parser
+    partial_summaries = map_chain.batch(
+        [{"context": chunk} for chunk in chunks],
+        config={"max_concurrency": MAP_MAX_CONCURRENCY},
     )
-    reduce_chain = reduce_prompt | llm | parser
+
+    reduce_chain = REDUCE_PROMPT | llm | parser
     final_summary = reduce_chain.invoke(
         {"summaries": "\n\n".join(partial_summaries)}
     )
@@ -0,0 +1,72 @@
+import io
+
+import pandas as pd
+
+from legacy_scopus.app import build_works_summary, normalize_df, to_excel_bytes, top_by_column
+
+
+def test_to_excel_bytes_round_trip() -> None:
+    df = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+
+    result = pd.read_excel(io.BytesIO(to_excel_bytes(df)), sheet_name="bibliometria")
+
+    pd.testing.assert_frame_equal(result, df)
+
+
+def test_to_excel_bytes_round_trip_normalized_entries() -> None:
+    entries = [
+        {
+            "eid": f"2-s2.0-{i}",
+            "dc:title": f"Titulo {i}",
+            "dc:creator": f"Autor {i}",
+            "prism:coverDate": f"202{i}-01-01",
+            "prism:publicationName": "Periodico",
+            "citedby-count": str(i),
+            "prism:url": f"https://api.elsevier.com/content/abstract/scopus_id/{i}",
+        }
+        for i in range(3)
+    ]
+    df = normalize_df(entries)
+
+    result = pd.read_excel(io.BytesIO(to_excel_bytes(df)), sheet_name="bibliometria")
+
+    assert result["titulo"].tolist() == ["Titulo 0", "Titulo 1", "Titulo 2"]
+    assert result["autor"].tolist() == ["Autor 0", "Autor 1", "Autor 2"]
+    assert result["url_scopus"].notna().all()
+    assert result["citacoes"].tolist() == [0, 1, 2]
+
+
+def test_build_works_summary_skips_missing_doi() -> None:
+    entries = [
+        {
+            "eid": "2-s2.0-1",
+            "dc:title": "Com DOI",
+            "citedby-count": "5",
+            "prism:doi": "10.1000/abc",
+            "prism:url": "https://api.elsevier.com/content/abstract/scopus_id/1",
+        },
+        {
+            "eid": "2-s2.0-2",
+            "dc:title": "Sem DOI",
+            "citedby-count": "1",
+        },
+    ]
+    df = normalize_df(entries)
+
+    text, _ = build_works_summary(df)
+
+    assert "DOI: 10.1000/abc" in text
+    assert "None" not in text
+    assert text.count("DOI:") == 1
+    assert text.count("Link Scopus:") == 1
+
+
+def test_top_by_column_drops_unused_categories() -> None:
+    entries = [{"eid": f"2-s2.0-{i}", "dc:creator": f"Autor {i % 40}"} for i in range(100)]
+    df = normalize_df(entries)
+
+    top = top_by_column(df, "autor", 15)
+
+    assert len(top) == 15
+    assert top["autor"].dtype == object
+    assert top["publicacoes"].sum() == 15 * 3